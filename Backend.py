@@ -1,6 +1,9 @@
 from flask import Flask, request, jsonify, send_from_directory
 import os
+import re
 import uuid
+import threading
+from image_hash import BKTree, DUPLICATE_DISTANCE, hash_bytes, hash_file
 
 app = Flask(__name__)
 
@@ -8,6 +11,39 @@ app = Flask(__name__)
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Perceptual-hash index of the uploads stored in UPLOAD_FOLDER, built on first use.
+# Edited exports from /save_image stay out of it, so saving a copy never makes
+# the original count as a duplicate on its next import.
+SAVED_EXPORT_NAME = re.compile(r"^[0-9a-f]{32}_")
+hash_index = BKTree()
+indexed_hashes = {}  # Map: stored path -> perceptual hash
+hash_index_lock = threading.Lock()
+hash_index_built = False
+
+
+def ensure_hash_index():
+    """Hash the files already in UPLOAD_FOLDER once, on the first request. Caller holds hash_index_lock."""
+    global hash_index_built
+    if hash_index_built:
+        return
+    for name in os.listdir(UPLOAD_FOLDER):
+        if SAVED_EXPORT_NAME.match(name):
+            continue
+        existing_path = os.path.join(UPLOAD_FOLDER, name)
+        if existing_path not in indexed_hashes:
+            index_path(existing_path, hash_file(existing_path))
+    hash_index_built = True
+
+
+def index_path(path, image_hash):
+    """Point `path` at `image_hash`, dropping whatever the path held before. Caller holds hash_index_lock."""
+    old_hash = indexed_hashes.pop(path, None)
+    if old_hash is not None:
+        hash_index.remove(old_hash, path)
+    if image_hash is not None:
+        indexed_hashes[path] = image_hash
+        hash_index.add(image_hash, path)
+
 
 # Function to save uploaded image
 @app.route("/upload", methods=["POST"])
@@ -19,9 +55,28 @@ def upload_image():
     if file.filename == '':
         return jsonify({"error": "No selected file"}), 400
 
-    # Save the file with a unique name
     file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(file_path)
+    image_hash = hash_bytes(file.read())
+    file.seek(0)
+
+    # Skip near-duplicates (e.g. burst frames) before they are stored, and
+    # reserve the index entry under the lock so the disk write can run outside it
+    with hash_index_lock:
+        ensure_hash_index()
+        if image_hash is not None:
+            matches = [match for match in hash_index.search(image_hash, DUPLICATE_DISTANCE) if match[1] != file_path]
+            if matches:
+                return jsonify({"message": "Near-duplicate skipped", "duplicate_of": matches[0][1]})
+        previous_hash = indexed_hashes.get(file_path)
+        index_path(file_path, image_hash)
+
+    try:
+        file.save(file_path)
+    except Exception:
+        # Nothing new reached the disk, so put the path's old entry back
+        with hash_index_lock:
+            index_path(file_path, previous_hash)
+        raise
 
     return jsonify({"message": "File uploaded successfully", "file_path": file_path})
 
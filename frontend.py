@@ -12,10 +12,12 @@ from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.gridlayout import GridLayout
+from kivy.uix.modalview import ModalView
 from plyer import filechooser
 import cv2
 import numpy as np
-from PIL import Image as PILImage
+from image_hash import BKTree, SIMILAR_DISTANCE, hash_file
+from image_pipeline import SpatialFilter, channel_gains, hue_rotation, run_pipeline, split_pointwise_tail
 
 BACKEND_URL = "http://127.0.0.1:5000"
 
@@ -39,10 +41,15 @@ class ImageEditorApp(App):
         self.message_label = Label(text="", size_hint=(1, 0.03), color=(1, 1, 1, 1), halign="center", valign="middle")
         self.main_layout.add_widget(self.message_label)
 
-        # Add Images Button
-        add_images_button = Button(text="Add Images", size_hint=(1, 0.1))
+        # Add Images and Find Similar Buttons
+        top_buttons = BoxLayout(orientation="horizontal", size_hint=(1, 0.1))
+        add_images_button = Button(text="Add Images")
         add_images_button.bind(on_press=self.open_gallery)
-        self.main_layout.add_widget(add_images_button)
+        top_buttons.add_widget(add_images_button)
+        find_similar_button = Button(text="Find Similar")
+        find_similar_button.bind(on_press=self.find_similar)
+        top_buttons.add_widget(find_similar_button)
+        self.main_layout.add_widget(top_buttons)
 
         # Main Image Carousel
         self.carousel = Carousel(direction="right", size_hint=(1, 0.4))
@@ -75,6 +82,10 @@ class ImageEditorApp(App):
         # Track images
         self.image_paths = []  # Original image paths
         self.modified_images = {}  # Map: original path -> modified path
+        self.applied_styles = {}  # Map: original path -> art style name
+        self.styled_cache = None  # (original path, style, image after the style's spatial filters) of the last render
+        self.image_hashes = {}  # Map: original path -> perceptual hash
+        self.hash_index = BKTree()  # Perceptual hash -> original paths
 
         # Predefined Art Styles
         self.art_styles = ["Original", "Van Gogh", "Pop Art", "Sketch", "Painting", "Pointillism", "Surreal", "Cubism"]
@@ -93,25 +104,50 @@ class ImageEditorApp(App):
         if not selection:
             return
 
+        skipped = 0
         for image_path in selection:
             if os.path.exists(image_path) and os.path.isfile(image_path):
-                # Upload image to backend
-                self.upload_image_to_backend(image_path)
+                # Upload image to backend, leaving out frames it reports as near-duplicates
+                result = self.upload_image_to_backend(image_path)
+                if result and "duplicate_of" in result:
+                    skipped += 1
+                    continue
                 self.image_paths.append(image_path)
+                self.index_image(image_path)
                 self.add_image_to_carousel(image_path)
                 self.add_image_to_thumbnails(image_path)
 
+        if skipped:
+            self.message_label.text = f"Skipped {skipped} near-duplicate image(s)."
+            self.message_label.color = (1, 1, 0, 1)  # Yellow for skipped
+            from kivy.clock import Clock
+            Clock.schedule_once(self.clear_message, 3)
+
     def upload_image_to_backend(self, image_path):
-        """Send the selected image to the backend for upload."""
+        """Send the selected image to the backend for upload and return its JSON reply, or None on error."""
         url = BACKEND_URL + "/upload"
         with open(image_path, 'rb') as f:
             files = {'file': (os.path.basename(image_path), f)}
             response = requests.post(url, files=files)
 
-        if response.status_code == 200:
-            print("Image uploaded successfully:", response.json())
-        else:
+        if response.status_code != 200:
             print("Error uploading image:", response.text)
+            return None
+
+        result = response.json()
+        if "duplicate_of" in result:
+            print("Skipped near-duplicate of", result["duplicate_of"])
+        else:
+            print("Image uploaded successfully:", result)
+        return result
+
+    def index_image(self, image_path):
+        """Record the perceptual hash of an imported image for similarity lookup."""
+        image_hash = hash_file(image_path)
+        if image_hash is None:
+            return
+        self.image_hashes[image_path] = image_hash
+        self.hash_index.add(image_hash, image_path)
 
     def add_image_to_carousel(self, image_path):
         img = Image(source=image_path, allow_stretch=True)
@@ -130,6 +166,42 @@ class ImageEditorApp(App):
                     self.carousel.load_slide(widget)
                     break
 
+    def find_similar(self, instance):
+        """Show the imported images that look like the current slide."""
+        current_image = self.carousel.current_slide
+        if not current_image or not current_image.source:
+            return
+
+        original_path = next((k for k, v in self.modified_images.items() if v == current_image.source), None)
+        if original_path not in self.image_hashes:
+            return
+
+        matches = [path for distance, path in self.hash_index.search(self.image_hashes[original_path], SIMILAR_DISTANCE)
+                   if path != original_path]
+        if not matches:
+            self.message_label.text = "No similar images found."
+            self.message_label.color = (1, 1, 1, 1)
+            from kivy.clock import Clock
+            Clock.schedule_once(self.clear_message, 3)
+            return
+
+        modal = ModalView(size_hint=(0.9, 0.4))
+        scrollview = ScrollView(do_scroll_x=True, do_scroll_y=False)
+        results_layout = GridLayout(rows=1, size_hint=(None, 1), spacing=10, padding=10)
+        results_layout.bind(minimum_width=results_layout.setter("width"))
+        for path in matches:
+            thumbnail = Image(source=self.modified_images[path], size_hint=(None, 1), width=150, allow_stretch=True)
+            thumbnail.bind(on_touch_down=lambda widget, touch, p=path: self.on_similar_click(widget, touch, p, modal))
+            results_layout.add_widget(thumbnail)
+        scrollview.add_widget(results_layout)
+        modal.add_widget(scrollview)
+        modal.open()
+
+    def on_similar_click(self, instance, touch, image_path, modal):
+        if instance.collide_point(*touch.pos):
+            self.on_thumbnail_click(instance, touch, image_path)
+            modal.dismiss()
+
     def add_art_style_buttons(self):
         for style in self.art_styles:
             button = Button(text=style, size_hint=(None, 1), width=150)
@@ -145,27 +217,46 @@ class ImageEditorApp(App):
         if not original_path:
             return
 
-        img = cv2.imread(original_path)
-        if img is None:
-            return
+        self.applied_styles[original_path] = style
+        self.render_image(current_image, original_path)
 
-        # Apply style effects
-        if style == "Original":
-            styled_image = img
-        elif style == "Van Gogh":
-            styled_image = self.apply_van_gogh_effect(img)
+    def style_operations(self, style):
+        """Return the operator chain that renders an art style."""
+        if style == "Van Gogh":
+            return [hue_rotation(60)]
         elif style == "Pop Art":
-            styled_image = self.apply_pop_art_effect(img)
+            return [SpatialFilter(self.apply_pop_art_effect)]
         elif style == "Sketch":
-            styled_image = self.apply_sketch_effect(img)
+            return [SpatialFilter(self.apply_sketch_effect)]
         elif style == "Painting":
-            styled_image = self.apply_painting_effect(img)
+            return [SpatialFilter(self.apply_painting_effect)]
         elif style == "Pointillism":
-            styled_image = self.apply_pointillism_effect(img)
+            return [SpatialFilter(self.apply_pointillism_effect)]
         elif style == "Surreal":
-            styled_image = self.apply_surreal_effect(img)
+            return [SpatialFilter(self.apply_surreal_effect)]
         elif style == "Cubism":
-            styled_image = self.apply_cubism_effect(img)
+            return [SpatialFilter(self.apply_cubism_effect)]
+        return []
+
+    def render_image(self, current_image, original_path):
+        """Render the selected style with the RGB sliders on top, reusing cached spatial filter output."""
+        style = self.applied_styles.get(original_path, "Original")
+        head, tail = split_pointwise_tail(self.style_operations(style))
+
+        # Only the last rendered slide is cached; that is all slider drags need
+        if self.styled_cache and self.styled_cache[:2] == (original_path, style):
+            base_image = self.styled_cache[2]
+        else:
+            img = cv2.imread(original_path)
+            if img is None:
+                return
+            base_image = run_pipeline(img, head)
+            self.styled_cache = (original_path, style, base_image)
+
+        # Slider moves only re-run the fused pointwise tail: a single LUT or cv2.transform pass
+        styled_image = run_pipeline(base_image, tail + [channel_gains(
+            self.red_slider.value / 255, self.green_slider.value / 255, self.blue_slider.value / 255
+        )])
 
         # Save the styled image to the temporary directory
         styled_image_path = os.path.join(self.temp_dir, f"styled_{style}_{os.path.basename(original_path)}")
@@ -177,11 +268,6 @@ class ImageEditorApp(App):
         self.modified_images[original_path] = styled_image_path
 
     # Filter effects (apply respective transformations to the image)
-    def apply_van_gogh_effect(self, img):
-        hsv_img = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        hsv_img[..., 0] = (hsv_img[..., 0] + 30) % 180
-        return cv2.cvtColor(hsv_img, cv2.COLOR_HSV2BGR)
-
     def apply_pop_art_effect(self, img):
         return cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
 
@@ -236,20 +322,7 @@ class ImageEditorApp(App):
         if not original_path:
             return
 
-        pil_image = PILImage.open(original_path).convert("RGB")
-        r, g, b = pil_image.split()
-
-        red_adjust = r.point(lambda p: p * self.red_slider.value / 255)
-        green_adjust = g.point(lambda p: p * self.green_slider.value / 255)
-        blue_adjust = b.point(lambda p: p * self.blue_slider.value / 255)
-
-        final_image = PILImage.merge("RGB", (red_adjust, green_adjust, blue_adjust))
-        styled_image_path = os.path.join(self.temp_dir, f"color_adjust_{os.path.basename(original_path)}")
-        final_image.save(styled_image_path)
-
-        current_image.source = styled_image_path
-        current_image.reload()
-        self.modified_images[original_path] = styled_image_path
+        self.render_image(current_image, original_path)
 
     def clear_message(self, dt):
         self.message_label.text = ""
@@ -0,0 +1,101 @@
+import cv2
+import numpy as np
+
+# Hamming distance (out of 64 bits) below which two images count as near-duplicates
+SIMILAR_DISTANCE = 10
+DUPLICATE_DISTANCE = 4
+
+
+def perceptual_hash(img):
+    """
+    Return the 64-bit DCT perceptual hash of a BGR or grayscale image.
+
+    The image is shrunk to 32x32, and each bit records whether one of the
+    8x8 lowest-frequency DCT coefficients is above their median, so burst
+    frames and re-encodes of the same shot land a few bits apart.
+    """
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(img, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])  # skip the DC term, it only tracks brightness
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def hash_file(path):
+    """Hash an image on disk, or return None if it cannot be decoded."""
+    # Decode at 1/8 scale: the hash only looks at 32x32, and both sides must decode the same way
+    img = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    return None if img is None else perceptual_hash(img)
+
+
+def hash_bytes(data):
+    """Hash an encoded image held in memory, or return None if it cannot be decoded."""
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    return None if img is None else perceptual_hash(img)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over perceptual hashes.
+
+    Each child edge is labelled with its Hamming distance to the parent, so a
+    search within `max_distance` only descends into edges inside
+    [d - max_distance, d + max_distance] and skips the rest of the tree.
+    """
+
+    def __init__(self):
+        self.root = None  # Node: [hash, items, {distance: child node}]
+        self.size = 0
+
+    def add(self, image_hash, item):
+        self.size += 1
+        if self.root is None:
+            self.root = [image_hash, [item], {}]
+            return
+
+        node = self.root
+        while True:
+            distance = hamming_distance(image_hash, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [image_hash, [item], {}]
+                return
+            node = child
+
+    def remove(self, image_hash, item):
+        """Drop one occurrence of `item` stored under `image_hash`; the node stays as a routing point."""
+        node = self.root
+        while node is not None:
+            distance = hamming_distance(image_hash, node[0])
+            if distance == 0:
+                if item in node[1]:
+                    node[1].remove(item)
+                    self.size -= 1
+                return
+            node = node[2].get(distance)
+
+    def search(self, image_hash, max_distance):
+        """Return (distance, item) pairs within `max_distance`, closest first."""
+        results = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(image_hash, node[0])
+            if distance <= max_distance:
+                results.extend((distance, item) for item in node[1])
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        results.sort(key=lambda result: result[0])
+        return results
+
+    def __len__(self):
+        return self.size
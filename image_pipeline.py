@@ -0,0 +1,161 @@
+import cv2
+import numpy as np
+
+
+class ColorMatrix:
+    """Affine colour transform applied to every BGR pixel: out = A @ px + b."""
+
+    def __init__(self, matrix, offset=(0, 0, 0)):
+        self.matrix = np.asarray(matrix, dtype=np.float64).reshape(3, 3)
+        self.offset = np.asarray(offset, dtype=np.float64).reshape(3)
+
+    def then(self, other):
+        """Compose with another matrix so that `other` runs after this one."""
+        return ColorMatrix(other.matrix @ self.matrix, other.matrix @ self.offset + other.offset)
+
+    def is_diagonal(self):
+        return not np.any(self.matrix - np.diag(np.diag(self.matrix)))
+
+    def is_identity(self):
+        return np.allclose(self.matrix, np.eye(3)) and np.allclose(self.offset, 0)
+
+    def to_lut(self):
+        """Bake a diagonal matrix into a per-channel lookup table."""
+        ramp = np.arange(256, dtype=np.float64)
+        table = np.stack([ramp * self.matrix[c, c] + self.offset[c] for c in range(3)], axis=1)
+        return ChannelLUT(np.clip(np.rint(table), 0, 255))
+
+    def apply(self, img):
+        # 3x4 affine form: cv2.transform adds the last column and saturates to uint8
+        return cv2.transform(img, np.hstack([self.matrix, self.offset[:, None]]))
+
+
+class ChannelLUT:
+    """Per-channel 256-entry lookup table in BGR order."""
+
+    def __init__(self, table):
+        table = np.asarray(table)
+        if table.ndim == 1:
+            table = np.repeat(table[:, None], 3, axis=1)
+        self.table = table.reshape(256, 3).astype(np.uint8)
+
+    def then(self, other):
+        """Compose with another table so that `other` runs after this one."""
+        return ChannelLUT(np.stack([other.table[self.table[:, c], c] for c in range(3)], axis=1))
+
+    def is_identity(self):
+        return np.array_equal(self.table[:, 0], np.arange(256)) and not np.any(self.table - self.table[:, :1])
+
+    def apply(self, img):
+        return cv2.LUT(img, self.table.reshape(1, 256, 3))
+
+
+class SpatialFilter:
+    """Any non-pointwise step (blur, edge detection, custom effect); pointwise steps never fuse across it."""
+
+    def __init__(self, func):
+        self.func = func
+
+    def apply(self, img):
+        return self.func(img)
+
+
+POINTWISE_OPS = (ColorMatrix, ChannelLUT)
+
+
+def channel_gains(red=1.0, green=1.0, blue=1.0):
+    return ColorMatrix(np.diag([blue, green, red]))
+
+
+def hue_rotation(degrees):
+    """
+    Rotate hue by `degrees` (0-360, red towards yellow) as one colour matrix.
+
+    The RGB cube is rotated around the gray (1, 1, 1) axis with Rodrigues'
+    formula. Hue moves in the same direction as an HSV shift, but saturated
+    colours lose value: at 60 degrees pure red becomes dark olive (170, 170, 0)
+    rather than HSV's yellow (255, 255, 0).
+    """
+    cos_a = np.cos(np.radians(degrees))
+    sin_a = np.sin(np.radians(degrees))
+    axis = np.ones(3) / np.sqrt(3)
+    cross = np.array([
+        [0, -axis[2], axis[1]],
+        [axis[2], 0, -axis[0]],
+        [-axis[1], axis[0], 0],
+    ])
+    rgb = cos_a * np.eye(3) + sin_a * cross + (1 - cos_a) * np.outer(axis, axis)
+    # Images are BGR, so reverse both the output rows and the input columns
+    return ColorMatrix(rgb[::-1, ::-1])
+
+
+def invert():
+    return ColorMatrix(-np.eye(3), (255, 255, 255))
+
+
+def lookup_table(table):
+    return ChannelLUT(table)
+
+
+def _as_lut(op):
+    return op if isinstance(op, ChannelLUT) else op.to_lut()
+
+
+def _fuse(first, second):
+    """Merge two pointwise steps into one, or return None if they cannot share a pass."""
+    if isinstance(first, ColorMatrix) and isinstance(second, ColorMatrix):
+        return first.then(second)
+    per_channel = all(isinstance(op, ChannelLUT) or op.is_diagonal() for op in (first, second))
+    if per_channel:
+        return _as_lut(first).then(_as_lut(second))
+    return None
+
+
+def plan_pipeline(operations):
+    """
+    Fuse runs of pointwise operations into as few passes as possible.
+
+    Adjacent colour matrices compose into a single matrix, and adjacent
+    per-channel steps (LUTs, gains) compose into a single table; spatial
+    filters keep their place in the chain. Fused matrices skip the
+    intermediate uint8 saturation, which only changes pixels that would have
+    clipped half way through the chain.
+    """
+    stages = []
+    for op in operations:
+        if stages and isinstance(op, POINTWISE_OPS) and isinstance(stages[-1], POINTWISE_OPS):
+            fused = _fuse(stages[-1], op)
+            if fused is not None:
+                stages[-1] = fused
+                continue
+        stages.append(op)
+
+    planned = []
+    for stage in stages:
+        if isinstance(stage, POINTWISE_OPS) and stage.is_identity():
+            continue
+        if isinstance(stage, ColorMatrix) and stage.is_diagonal():
+            stage = stage.to_lut()  # a table lookup is cheaper than a matrix multiply
+        planned.append(stage)
+    return planned
+
+
+def split_pointwise_tail(operations):
+    """
+    Split `operations` into (head, tail) where tail is the trailing run of
+    pointwise steps, so the output of head can be cached and only the cheap
+    fused colour pass re-run when the tail changes.
+    """
+    split = len(operations)
+    while split > 0 and isinstance(operations[split - 1], POINTWISE_OPS):
+        split -= 1
+    return list(operations[:split]), list(operations[split:])
+
+
+def run_pipeline(img, operations):
+    """Apply `operations` to a BGR image in order, fusing pointwise steps first."""
+    for stage in plan_pipeline(operations):
+        if isinstance(stage, POINTWISE_OPS) and img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        img = stage.apply(img)
+    return img
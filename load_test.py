@@ -0,0 +1,294 @@
+"""
+Load generator for the Backend.py /upload and /save_image endpoints.
+
+Example:
+    python load_test.py --start-backend --concurrency 1,4,16 --requests 200 \
+        --sizes 640x480,1920x1080 --mix upload=3,save_image=1
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import requests
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_sizes(text):
+    sizes = []
+    for item in text.split(","):
+        width, height = item.lower().split("x")
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(","):
+        endpoint, weight = item.split("=")
+        mix[endpoint.strip().lstrip("/")] = float(weight)
+    return mix
+
+
+def synthetic_image(width, height, image_format, rng):
+    """Encode a random gradient-plus-noise image, distinct enough to pass the duplicate check."""
+    x = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    channels = []
+    for _ in range(3):
+        fx, fy, phase = rng.uniform(1, 12), rng.uniform(1, 12), rng.uniform(0, 2 * math.pi)
+        channels.append(127 + 100 * np.sin(2 * math.pi * (fx * x + fy * y) + phase))
+    img = np.stack(channels, axis=2)
+    img += rng.normal(0, 12, img.shape).astype(np.float32)
+    ok, encoded = cv2.imencode("." + image_format, np.clip(img, 0, 255).astype(np.uint8))
+    if not ok:
+        raise ValueError(f"Could not encode image as {image_format}")
+    return encoded.tobytes()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def folder_bytes(folder):
+    if not folder or not os.path.isdir(folder):
+        return 0
+    return sum(entry.stat().st_size for entry in os.scandir(folder) if entry.is_file())
+
+
+def start_backend(port):
+    """Run Backend.py in a scratch directory so its uploads folder starts empty."""
+    work_dir = tempfile.mkdtemp(prefix="backend_load_")
+    env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    # Log to a file rather than a pipe: the request log would fill an unread pipe and stall the backend
+    log_path = os.path.join(work_dir, "backend.log")
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-c", f"import Backend; Backend.app.run(port={port}, threaded=True)"],
+            cwd=work_dir, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            if process.poll() is not None:
+                break
+            try:
+                requests.get(url, timeout=0.5)
+                return process, url, os.path.join(work_dir, "uploads")
+            except requests.ConnectionError:
+                time.sleep(0.1)
+    except BaseException:
+        # e.g. Ctrl-C while waiting: don't leave the backend or its scratch directory behind
+        process.terminate()
+        process.wait()
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
+    if process.poll() is None:
+        process.terminate()
+        process.wait()
+        reason = "Backend did not start listening in time"
+    else:
+        reason = f"Backend exited during startup with code {process.returncode}"
+    with open(log_path) as log:
+        output = log.read()
+    shutil.rmtree(work_dir, ignore_errors=True)
+    raise RuntimeError(f"{reason}. Backend output:\n{output}")
+
+
+def build_plan(total_requests, sizes, mix, image_format, pool_size, rng):
+    """
+    Pick the endpoint and encoded payload of every request up front, so the
+    timed loop only posts and the plan is reproducible for a given seed.
+
+    With `pool_size` 0 every request gets its own image; otherwise each size
+    cycles through `pool_size` images, and repeats sent to /upload show up as
+    skipped duplicates.
+    """
+    endpoints = list(mix)
+    weights = [mix[e] for e in endpoints]
+    pools = {size: [] for size in sizes}
+    pool_pos = {size: 0 for size in sizes}
+    plan = []
+    for _ in range(total_requests):
+        endpoint = endpoints[rng.choice(len(endpoints), p=np.array(weights) / sum(weights))]
+        size = sizes[rng.integers(len(sizes))]
+        pool = pools[size]
+        if pool_size and len(pool) >= pool_size:
+            data = pool[pool_pos[size] % pool_size]
+            pool_pos[size] += 1
+        else:
+            data = synthetic_image(size[0], size[1], image_format, rng)
+            if pool_size:
+                pool.append(data)
+        plan.append((endpoint, size, data))
+    return plan
+
+
+def send_request(session, url, endpoint, size, data, image_format, timeout):
+    """Post one pre-encoded image and time the HTTP round trip."""
+    filename = f"load_{uuid.uuid4().hex}.{image_format}"
+    result = {"endpoint": endpoint, "size": f"{size[0]}x{size[1]}", "bytes": len(data)}
+
+    start = time.perf_counter()
+    try:
+        response = session.post(f"{url}/{endpoint}", files={"file": (filename, data)}, timeout=timeout)
+        result["latency"] = time.perf_counter() - start
+        result["status"] = response.status_code
+        result["ok"] = response.status_code == 200
+        result["skipped"] = result["ok"] and "duplicate_of" in response.json()
+    except (requests.RequestException, ValueError) as e:
+        result["latency"] = time.perf_counter() - start
+        result["status"] = None
+        result["ok"] = False
+        result["skipped"] = False
+        result["error"] = type(e).__name__
+    return result
+
+
+def summarize(results, elapsed):
+    """Throughput and bandwidth count successful requests only, so failing fast never looks faster."""
+    succeeded = [r for r in results if r["ok"]]
+    latencies = sorted(r["latency"] for r in succeeded)
+    errors = len(results) - len(succeeded)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": errors / len(results) if results else 0.0,
+        "skipped_duplicates": sum(1 for r in results if r["skipped"]),
+        "throughput_rps": len(succeeded) / elapsed if elapsed else 0.0,
+        "upload_mb_per_s": sum(r["bytes"] for r in succeeded) / elapsed / 1e6 if elapsed else 0.0,
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(latencies[-1] if latencies else None),
+        },
+    }
+
+
+def run_level(url, concurrency, plan, sizes, mix, image_format, timeout, upload_folder):
+    """Send the planned requests with `concurrency` workers and summarise them."""
+    endpoints = list(mix)
+    local = threading.local()
+
+    def worker(job):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return send_request(local.session, url, job[0], job[1], job[2], image_format, timeout)
+
+    disk_before = folder_bytes(upload_folder)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, plan))
+    elapsed = time.perf_counter() - start
+    disk_written = folder_bytes(upload_folder) - disk_before
+
+    report = summarize(results, elapsed)
+    report.update({
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "disk_bytes_written": disk_written if upload_folder else None,
+        "disk_write_mb_per_s": disk_written / elapsed / 1e6 if upload_folder and elapsed else None,
+        "by_endpoint": {},
+        "by_size": {},
+    })
+    for endpoint in endpoints:
+        subset = [r for r in results if r["endpoint"] == endpoint]
+        if subset:
+            report["by_endpoint"][endpoint] = summarize(subset, elapsed)
+    for width, height in sizes:
+        subset = [r for r in results if r["size"] == f"{width}x{height}"]
+        if subset:
+            report["by_size"][f"{width}x{height}"] = summarize(subset, elapsed)
+    return report
+
+
+def print_level(report):
+    latency = report["latency_ms"]
+    disk = report["disk_write_mb_per_s"]
+    print(f"concurrency={report['concurrency']:<4} "
+          f"rps={report['throughput_rps']:8.1f} "
+          f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms "
+          f"errors={report['error_rate']:.1%} "
+          f"disk={'n/a' if disk is None else f'{disk:.1f}MB/s'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the image backend upload and save endpoints.")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="Backend base URL")
+    parser.add_argument("--start-backend", action="store_true", help="Start Backend.py locally for the run")
+    parser.add_argument("--port", type=int, default=5055, help="Port used with --start-backend")
+    parser.add_argument("--upload-folder", default=None,
+                        help="Backend UPLOAD_FOLDER, used to measure disk write bandwidth")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated worker counts to sweep")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--sizes", default="640x480,1920x1080", help="Comma-separated WIDTHxHEIGHT image sizes")
+    parser.add_argument("--mix", default="upload=1,save_image=1", help="Endpoint weights, e.g. upload=3,save_image=1")
+    parser.add_argument("--format", default="jpg", choices=["jpg", "png"], help="Encoding of synthetic images")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--pool-size", type=int, default=0,
+                        help="Distinct images per size, reused in turn; 0 generates one per request "
+                             "(all payloads are held in memory before each level starts)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the request plan and image content")
+    parser.add_argument("--output", default="load_report.json", help="Where to write the JSON report")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    sizes = parse_sizes(args.sizes)
+    mix = parse_mix(args.mix)
+    url, upload_folder, backend = args.url.rstrip("/"), args.upload_folder, None
+    if args.start_backend:
+        backend, url, upload_folder = start_backend(args.port)
+
+    try:
+        levels = []
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            plan = build_plan(args.requests, sizes, mix, args.format, args.pool_size, rng)
+            report = run_level(url, concurrency, plan, sizes, mix, args.format, args.timeout, upload_folder)
+            print_level(report)
+            levels.append(report)
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait()
+            shutil.rmtree(os.path.dirname(upload_folder), ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "url": url,
+            "config": {
+                "requests_per_level": args.requests,
+                "sizes": args.sizes,
+                "mix": mix,
+                "format": args.format,
+                "pool_size": args.pool_size,
+                "seed": args.seed,
+            },
+            "levels": levels,
+        }, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()